@@ -1,18 +1,52 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, flash
+import json
 import os
+import zlib
+import threading
+import time
 from templates.land_registry import LandRegistry
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'  # Change this in production
+app.config['BLOCKCHAIN_FILE'] = os.environ.get('LAND_REGISTRY_BLOCKCHAIN_FILE', 'blockchain_data.json')
 
-# Initialize land registry
-land_registry = LandRegistry()
+# The land registry is built on first use (or by init_land_registry at startup)
+# so importing the app stays cheap
+land_registry = None
+land_registry_lock = threading.Lock()
+startup_timings = {}
+
+def init_land_registry():
+    """Build the land registry, recording how long each startup phase took"""
+    global land_registry
+    with land_registry_lock:
+        if land_registry is None:
+            started = time.perf_counter()
+            registry = LandRegistry(blockchain_file=app.config['BLOCKCHAIN_FILE'])
+            startup_timings.update(registry.startup_timings)
+            startup_timings['init_land_registry'] = time.perf_counter() - started
+            land_registry = registry
+    return land_registry
+
+def get_land_registry():
+    """Get the land registry, building it if needed"""
+    return land_registry or init_land_registry()
+
+@app.before_request
+def reject_writes_on_replica():
+    """Refuse registrations and transfers when running as a read-only replica"""
+    # A local write would fork the replica's chain from its primary
+    if app.config.get('READ_ONLY') and request.method == 'POST':
+        return jsonify({
+            'success': False,
+            'message': 'This registry is a read-only replica; send writes to the primary'
+        }), 403
 
 @app.route('/')
 def index():
     """Main dashboard"""
-    stats = land_registry.get_blockchain_stats()
-    recent_lands = land_registry.get_all_lands()[-5:]  # Get last 5 lands
+    stats = get_land_registry().get_blockchain_stats()
+    recent_lands = get_land_registry().get_all_lands()[-5:]  # Get last 5 lands
     return render_template('index.html', stats=stats, recent_lands=recent_lands)
 
 @app.route('/register', methods=['GET', 'POST'])
@@ -32,7 +66,7 @@ def register_land():
                 'description': request.form.get('description', '')
             }
             
-            result = land_registry.register_land(land_id, owner_name, owner_address, land_details)
+            result = get_land_registry().register_land(land_id, owner_name, owner_address, land_details)
             
             if result['success']:
                 flash(result['message'], 'success')
@@ -61,7 +95,7 @@ def transfer_land():
                 'notes': request.form.get('notes', '')
             }
             
-            result = land_registry.transfer_land(land_id, from_owner, to_owner, to_owner_name, transfer_details)
+            result = get_land_registry().transfer_land(land_id, from_owner, to_owner, to_owner_name, transfer_details)
             
             if result['success']:
                 flash(result['message'], 'success')
@@ -77,44 +111,81 @@ def transfer_land():
 @app.route('/lands')
 def view_all_lands():
     """View all registered lands"""
-    lands = land_registry.get_all_lands()
+    lands = get_land_registry().get_all_lands()
     return render_template('view_records.html', lands=lands)
 
 @app.route('/land/<land_id>')
 def view_land(land_id):
     """View specific land details"""
-    land_info = land_registry.get_land_info(land_id)
+    land_info = get_land_registry().get_land_info(land_id)
     return render_template('land_details.html', land_info=land_info)
 
 @app.route('/api/land/<land_id>')
 def api_get_land(land_id):
     """API endpoint to get land information"""
-    return jsonify(land_registry.get_land_info(land_id))
+    return jsonify(get_land_registry().get_land_info(land_id))
 
 @app.route('/api/lands')
 def api_get_all_lands():
     """API endpoint to get all lands"""
-    return jsonify(land_registry.get_all_lands())
+    return jsonify(get_land_registry().get_all_lands())
 
 @app.route('/api/stats')
 def api_get_stats():
     """API endpoint to get blockchain statistics"""
-    return jsonify(land_registry.get_blockchain_stats())
+    return jsonify(get_land_registry().get_blockchain_stats())
 
 @app.route('/api/verify')
 def api_verify_blockchain():
     """API endpoint to verify blockchain integrity"""
-    is_valid = land_registry.verify_blockchain_integrity()
+    is_valid = get_land_registry().verify_blockchain_integrity()
     return jsonify({
         'valid': is_valid,
         'message': 'Blockchain is valid' if is_valid else 'Blockchain integrity compromised'
     })
 
+@app.route('/api/blocks')
+def api_get_blocks():
+    """API endpoint streaming blocks above from_height as JSON lines, gzipped if accepted"""
+    try:
+        from_height = int(request.args.get('from_height', -1))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'from_height must be an integer'}), 400
+    blockchain = get_land_registry().blockchain
+    blocks = blockchain.get_blocks_after(from_height)
+    compress = 'gzip' in request.headers.get('Accept-Encoding', '')
+    
+    def generate():
+        compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31 writes gzip framing
+        for block in blocks:
+            line = (json.dumps(block.to_dict()) + "\n").encode()
+            yield compressor.compress(line) if compressor else line
+        if compressor:
+            yield compressor.flush()
+    
+    response = Response(generate(), mimetype='application/x-ndjson')
+    response.headers['X-Chain-Height'] = str(blockchain.get_latest_block().index)
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+@app.route('/api/health')
+def api_health():
+    """API endpoint for liveness checks"""
+    return jsonify({'status': 'ok'})
+
+@app.route('/api/ready')
+def api_ready():
+    """API endpoint that reports ready only once the land registry has loaded"""
+    if land_registry is None:
+        return jsonify({'ready': False, 'startup_timings': startup_timings}), 503
+    return jsonify({'ready': True, 'startup_timings': startup_timings})
+
 @app.route('/blockchain')
 def view_blockchain():
     """View blockchain details"""
-    stats = land_registry.get_blockchain_stats()
-    all_transactions = land_registry.blockchain.get_all_transactions()
+    stats = get_land_registry().get_blockchain_stats()
+    all_transactions = get_land_registry().blockchain.get_all_transactions()
     return render_template('blockchain.html', stats=stats, transactions=all_transactions)
 
 @app.errorhandler(404)
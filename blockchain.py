@@ -1,15 +1,17 @@
 import hashlib
+import hmac
 import json
 import time
 from datetime import datetime
 
 class Block:
-    def __init__(self, index, transactions, timestamp, previous_hash, nonce=0):
+    def __init__(self, index, transactions, timestamp, previous_hash, nonce=0, signature=None):
         self.index = index
         self.transactions = transactions
         self.timestamp = timestamp
         self.previous_hash = previous_hash
         self.nonce = nonce
+        self.signature = signature  # Set by authority sealing; not part of the hash
         self.hash = self.calculate_hash()
     
     def calculate_hash(self):
@@ -30,6 +32,31 @@ class Block:
             self.nonce += 1
             self.hash = self.calculate_hash()
         print(f"Block mined: {self.hash}")
+    
+    def to_dict(self):
+        return {
+            "index": self.index,
+            "transactions": self.transactions,
+            "timestamp": self.timestamp,
+            "previous_hash": self.previous_hash,
+            "hash": self.hash,
+            "nonce": self.nonce,
+            "signature": self.signature
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a block from its saved form, keeping the stored hash"""
+        block = cls(
+            data["index"],
+            data["transactions"],
+            data["timestamp"],
+            data["previous_hash"],
+            data.get("nonce", 0),
+            data.get("signature")
+        )
+        block.hash = data["hash"]
+        return block
 
 class Transaction:
     def __init__(self, from_address, to_address, land_id, transaction_type, details=None):
@@ -50,17 +77,87 @@ class Transaction:
             "timestamp": self.timestamp
         }
 
+class ProofOfWorkSealer:
+    """Seal blocks by mining them, paying a mining reward per block"""
+    consensus = "proof_of_work"
+    pays_mining_reward = True
+    
+    def __init__(self, difficulty=2):
+        self.difficulty = difficulty
+    
+    def seal(self, block):
+        block.mine_block(self.difficulty)
+    
+    def verify(self, block):
+        return block.hash[:self.difficulty] == "0" * self.difficulty
+
+class AuthoritySealer:
+    """Seal blocks with the registry authority's HMAC signature instead of mining"""
+    consensus = "authority"
+    pays_mining_reward = False
+    
+    def __init__(self, key):
+        if not key:
+            raise ValueError("Authority sealing requires a signing key")
+        self.key = key
+    
+    def sign(self, block_hash):
+        return hmac.new(self.key.encode(), block_hash.encode(), hashlib.sha256).hexdigest()
+    
+    def seal(self, block):
+        block.signature = self.sign(block.hash)
+        print(f"Block sealed: {block.hash}")
+    
+    def verify(self, block):
+        return block.signature is not None and hmac.compare_digest(self.sign(block.hash), block.signature)
+
+def create_sealer(consensus="proof_of_work", difficulty=2, authority_key=None):
+    """Create the sealing strategy for a consensus mode"""
+    if consensus == ProofOfWorkSealer.consensus:
+        return ProofOfWorkSealer(difficulty)
+    if consensus == AuthoritySealer.consensus:
+        return AuthoritySealer(authority_key)
+    raise ValueError(f"Unknown consensus mode: {consensus}")
+
+def hash_ownership_state(ownership):
+    """Hash a land_id -> ownership snapshot in canonical form"""
+    state_string = json.dumps(ownership, sort_keys=True)
+    return hashlib.sha256(state_string.encode()).hexdigest()
+
 class Blockchain:
-    def __init__(self):
+    def __init__(self, checkpoint_interval=100, checkpoint_key=None, sealer=None):
         self.chain = [self.create_genesis_block()]
-        self.difficulty = 2
+        self.sealer = sealer or ProofOfWorkSealer(difficulty=2)
         self.pending_transactions = []
         self.mining_reward = 100
+        self.checkpoint_interval = checkpoint_interval  # 0 or None disables checkpoints
+        self.checkpoint_key = checkpoint_key
+    
+    @property
+    def consensus(self):
+        """Consensus mode the chain is sealed with"""
+        return self.sealer.consensus
+    
+    @property
+    def difficulty(self):
+        """Proof-of-work difficulty, or 0 for chains that are not mined"""
+        return getattr(self.sealer, 'difficulty', 0)
+    
+    @difficulty.setter
+    def difficulty(self, difficulty):
+        self.sealer.difficulty = difficulty
     
     def create_genesis_block(self):
         """Create the first block in the blockchain"""
         return Block(0, [], time.time(), "0")
     
+    def is_genesis_block(self, block):
+        """Check a block is an empty genesis block, the only block that is never sealed"""
+        return (block.index == 0
+                and not block.transactions
+                and block.previous_hash == "0"
+                and block.hash == block.calculate_hash())
+    
     def get_latest_block(self):
         """Get the latest block in the chain"""
         return self.chain[-1]
@@ -70,30 +167,204 @@ class Blockchain:
         self.pending_transactions.append(transaction.to_dict())
     
     def mine_pending_transactions(self, mining_reward_address):
-        """Mine all pending transactions"""
-        reward_transaction = {
-            "from_address": None,
-            "to_address": mining_reward_address,
-            "land_id": None,
-            "transaction_type": "mining_reward",
-            "details": {"amount": self.mining_reward},
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        self.pending_transactions.append(reward_transaction)
+        """Mine (or seal) all pending transactions into a new block and return it"""
+        if self.sealer.pays_mining_reward:
+            reward_transaction = {
+                "from_address": None,
+                "to_address": mining_reward_address,
+                "land_id": None,
+                "transaction_type": "mining_reward",
+                "details": {"amount": self.mining_reward},
+                "timestamp": datetime.now().isoformat()
+            }
+            
+            self.pending_transactions.append(reward_transaction)
         
         block = Block(
-            len(self.chain),
+            self.get_latest_block().index + 1,
             self.pending_transactions,
             time.time(),
             self.get_latest_block().hash
         )
         
-        block.mine_block(self.difficulty)
+        self.sealer.seal(block)
         
         print("Block successfully mined!")
         self.chain.append(block)
         self.pending_transactions = []
+        
+        if self.checkpoint_interval and block.index % self.checkpoint_interval == 0:
+            self.create_checkpoint()
+        
+        # The checkpoint may now be the latest block, so hand back the mined one
+        return block
+    
+    def get_checkpoint_details(self, block):
+        """Return the checkpoint details of a block, or None for ordinary blocks"""
+        if len(block.transactions) == 1 and block.transactions[0].get('transaction_type') == 'checkpoint':
+            return block.transactions[0].get('details', {})
+        return None
+    
+    def get_latest_checkpoint(self):
+        """Get the most recent checkpoint block in the chain"""
+        for block in reversed(self.chain):
+            if self.get_checkpoint_details(block) is not None:
+                return block
+        return None
+    
+    def sign_checkpoint(self, index, previous_hash, state_hash):
+        """Sign a checkpoint with the registry's checkpoint key"""
+        if not self.checkpoint_key:
+            return None
+        message = f"{index}:{previous_hash}:{state_hash}".encode()
+        return hmac.new(self.checkpoint_key.encode(), message, hashlib.sha256).hexdigest()
+    
+    def is_checkpoint_trusted(self, block):
+        """Check a checkpoint's state hash and, when a key is configured, its signature"""
+        details = self.get_checkpoint_details(block)
+        if details is None:
+            return False
+        
+        if block.hash != block.calculate_hash() or not self.sealer.verify(block):
+            return False
+        
+        state_hash = hash_ownership_state(details.get('ownership', {}))
+        if state_hash != details.get('state_hash'):
+            return False
+        
+        if self.checkpoint_key:
+            expected = self.sign_checkpoint(block.index, block.previous_hash, state_hash)
+            if not hmac.compare_digest(expected, details.get('signature') or ''):
+                return False
+        
+        return True
+    
+    def create_checkpoint(self):
+        """Mine a checkpoint block committing to the current ownership state"""
+        ownership = self.get_ownership_state()
+        state_hash = hash_ownership_state(ownership)
+        index = self.get_latest_block().index + 1
+        previous_hash = self.get_latest_block().hash
+        
+        checkpoint_transaction = {
+            "from_address": "SYSTEM",
+            "to_address": None,
+            "land_id": None,
+            "transaction_type": "checkpoint",
+            "details": {
+                "ownership": ownership,
+                "state_hash": state_hash,
+                "signature": self.sign_checkpoint(index, previous_hash, state_hash)
+            },
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        block = Block(index, [checkpoint_transaction], time.time(), previous_hash)
+        self.sealer.seal(block)
+        
+        print(f"Checkpoint created at block {index}")
+        self.chain.append(block)
+        return block
+    
+    def compact(self):
+        """Drop blocks before the latest checkpoint and return them for archiving"""
+        checkpoint = self.get_latest_checkpoint()
+        if checkpoint is None or checkpoint is self.chain[0]:
+            return []
+        
+        position = self.chain.index(checkpoint)
+        archived = [block.to_dict() for block in self.chain[:position]]
+        self.chain = self.chain[position:]
+        return archived
+    
+    def get_blocks_after(self, height):
+        """Get blocks above a height; starts at the first kept block if older ones were archived"""
+        start = max(0, height + 1 - self.chain[0].index)
+        return self.chain[start:]
+    
+    def append_block(self, block):
+        """Append a block received from another replica after verifying it
+        
+        Returns False if the block is a genesis block the chain already has.
+        Raises ValueError if the block does not verify or does not extend the chain.
+        """
+        latest = self.get_latest_block()
+        if block.hash != block.calculate_hash():
+            raise ValueError(f"Block {block.index} has an invalid hash")
+        
+        # Only a replica that has not synced past genesis may adopt the sender's
+        # genesis block or jump ahead to a signed checkpoint
+        fresh = len(self.chain) == 1 and self.is_genesis_block(latest)
+        
+        if block.index == 0:
+            if not self.is_genesis_block(block):
+                raise ValueError("Genesis block must be empty and have previous_hash \"0\"")
+            if block.hash == latest.hash:
+                return False
+            if not fresh:
+                raise ValueError("Cannot replace the genesis block of a non-empty chain")
+            self.chain = [block]
+            return True
+        
+        if not self.sealer.verify(block):
+            raise ValueError(f"Block {block.index} has an invalid seal")
+        
+        details = self.get_checkpoint_details(block)
+        if block.index == latest.index + 1 and block.previous_hash == latest.hash:
+            if details is not None:
+                if not self.is_checkpoint_trusted(block) or details.get('ownership') != self.get_ownership_state():
+                    raise ValueError(f"Checkpoint block {block.index} does not match the local state")
+            self.chain.append(block)
+            return True
+        
+        # The sender archived the blocks in between; a fresh or lagging replica may
+        # jump to its checkpoint, but only if the checkpoint carries a valid signature
+        if details is not None and (fresh and block.index > latest.index or block.index > latest.index + 1):
+            if not self.checkpoint_key or not self.is_checkpoint_trusted(block):
+                raise ValueError(f"Checkpoint block {block.index} is not signed with this registry's checkpoint key")
+            self.chain = [block]
+            return True
+        
+        raise ValueError(f"Block {block.index} does not extend the local chain at height {latest.index}")
+    
+    def get_ownership_state(self):
+        """Get land_id -> ownership records, replaying from the latest checkpoint"""
+        ownership = {}
+        start = 0
+        
+        checkpoint = self.get_latest_checkpoint()
+        if checkpoint is not None:
+            for land_id, record in self.get_checkpoint_details(checkpoint).get('ownership', {}).items():
+                ownership[land_id] = dict(record)
+            start = self.chain.index(checkpoint) + 1
+        
+        for block in self.chain[start:]:
+            for transaction in block.transactions:
+                land_id = transaction.get('land_id')
+                transaction_type = transaction.get('transaction_type')
+                if not land_id or transaction_type not in ['register', 'transfer']:
+                    continue
+                
+                if land_id not in ownership:
+                    ownership[land_id] = {
+                        "owner": None,
+                        "details": {},
+                        "registration_date": None,
+                        "last_transfer_date": None,
+                        "transaction_count": 0
+                    }
+                
+                record = ownership[land_id]
+                record['owner'] = transaction.get('to_address')
+                record['details'] = transaction.get('details', {})
+                record['transaction_count'] += 1
+                
+                if transaction_type == 'register':
+                    record['registration_date'] = transaction.get('details', {}).get('registration_date')
+                else:
+                    record['last_transfer_date'] = transaction.get('details', {}).get('transfer_date')
+        
+        return ownership
     
     def get_balance(self, address):
         """Get balance for an address (for future token implementation)"""
@@ -126,28 +397,64 @@ class Blockchain:
     
     def get_current_owner(self, land_id):
         """Get current owner of a land parcel"""
-        current_owner = None
-        
-        for block in self.chain:
-            for transaction in block.transactions:
+        # Walk back from the tip; the latest checkpoint answers for older blocks
+        for block in reversed(self.chain):
+            checkpoint = self.get_checkpoint_details(block)
+            if checkpoint is not None:
+                return checkpoint.get('ownership', {}).get(land_id, {}).get('owner')
+            
+            for transaction in reversed(block.transactions):
                 if transaction.get('land_id') == land_id:
                     if transaction.get('transaction_type') in ['register', 'transfer']:
-                        current_owner = transaction.get('to_address')
+                        return transaction.get('to_address')
         
-        return current_owner
+        return None
     
-    def is_chain_valid(self):
-        """Validate the blockchain"""
-        for i in range(1, len(self.chain)):
+    def is_chain_valid(self, from_checkpoint=False):
+        """Validate the blockchain
+        
+        With from_checkpoint, validation starts at the latest trusted checkpoint
+        instead of replaying every checkpoint snapshot from the first block.
+        """
+        start = 0
+        if from_checkpoint:
+            checkpoint = self.get_latest_checkpoint()
+            if checkpoint is not None:
+                if not self.is_checkpoint_trusted(checkpoint):
+                    return False
+                start = self.chain.index(checkpoint)
+        
+        # The first block is replayed but never sealed, so it needs its own check
+        if start == 0 and not (self.is_genesis_block(self.chain[0]) or self.is_checkpoint_trusted(self.chain[0])):
+            return False
+        
+        for i in range(start + 1, len(self.chain)):
             current_block = self.chain[i]
             previous_block = self.chain[i - 1]
             
             if current_block.hash != current_block.calculate_hash():
                 return False
             
+            if not self.sealer.verify(current_block):
+                return False
+            
             if current_block.previous_hash != previous_block.hash:
                 return False
         
+        if not from_checkpoint:
+            # Every checkpoint must be trusted and match the state replayed up to it
+            for i, block in enumerate(self.chain):
+                details = self.get_checkpoint_details(block)
+                if details is None:
+                    continue
+                if not self.is_checkpoint_trusted(block):
+                    return False
+                if i > 0:
+                    replay = Blockchain(checkpoint_interval=0, sealer=self.sealer)
+                    replay.chain = self.chain[:i]
+                    if replay.get_ownership_state() != details.get('ownership'):
+                        return False
+        
         return True
     
     def get_all_transactions(self):
@@ -166,17 +473,32 @@ class Blockchain:
     def to_dict(self):
         """Convert blockchain to dictionary for JSON serialization"""
         return {
-            "chain": [
-                {
-                    "index": block.index,
-                    "transactions": block.transactions,
-                    "timestamp": block.timestamp,
-                    "previous_hash": block.previous_hash,
-                    "hash": block.hash,
-                    "nonce": block.nonce
-                }
-                for block in self.chain
-            ],
+            "chain": [block.to_dict() for block in self.chain],
+            "consensus": self.consensus,
             "difficulty": self.difficulty,
+            "checkpoint_interval": self.checkpoint_interval,
             "pending_transactions": self.pending_transactions
         }
+    
+    @classmethod
+    def from_dict(cls, data, checkpoint_key=None, sealer=None):
+        """Rebuild a blockchain from its saved dictionary form
+        
+        The sealer (proof of work at the default difficulty if not given) comes
+        from configuration, never from the file, so a rewritten file cannot
+        downgrade the chain to a weaker mode. Raises ValueError if the saved
+        consensus mode differs from the sealer's.
+        """
+        sealer = sealer or ProofOfWorkSealer()
+        saved_consensus = data.get("consensus", ProofOfWorkSealer.consensus)
+        if saved_consensus != sealer.consensus:
+            raise ValueError(f"Saved blockchain is sealed with {saved_consensus}, not {sealer.consensus}")
+        
+        blockchain = cls(
+            checkpoint_interval=data.get("checkpoint_interval", 100),
+            checkpoint_key=checkpoint_key,
+            sealer=sealer
+        )
+        blockchain.chain = [Block.from_dict(block) for block in data["chain"]]
+        blockchain.pending_transactions = data.get("pending_transactions", [])
+        return blockchain
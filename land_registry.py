@@ -1,26 +1,74 @@
 import json
 import os
+import threading
+import time
 from datetime import datetime
-from templates.blockchain import Blockchain, Transaction
+from templates.blockchain import Block, Blockchain, Transaction, create_sealer
 
 class LandRegistry:
-    def __init__(self, blockchain_file='blockchain_data.json'):
-        self.blockchain = Blockchain()
+    def __init__(self, blockchain_file='blockchain_data.json', archive_file='blockchain_archive.jsonl',
+                 checkpoint_key=None, consensus=None, authority_key=None):
+        self.checkpoint_key = checkpoint_key or os.environ.get('LAND_REGISTRY_CHECKPOINT_KEY')
+        self.authority_key = authority_key or os.environ.get('LAND_REGISTRY_AUTHORITY_KEY')
+        consensus = consensus or os.environ.get('LAND_REGISTRY_CONSENSUS', 'proof_of_work')
+        self.blockchain = Blockchain(
+            checkpoint_key=self.checkpoint_key,
+            sealer=create_sealer(consensus, authority_key=self.authority_key)
+        )
         self.blockchain_file = blockchain_file
+        self.archive_file = archive_file
+        self.lock = threading.RLock()  # Serialises writes from threaded servers
+        self.startup_timings = {}
         self.load_blockchain()
     
     def load_blockchain(self):
-        """Load blockchain from file if it exists"""
-        if os.path.exists(self.blockchain_file):
-            try:
-                with open(self.blockchain_file, 'r') as f:
-                    data = json.load(f)
-                    # Reconstruct blockchain from saved data
-                    # For simplicity, we'll start fresh each time
-                    # In production, you'd properly reconstruct the chain
-                    pass
-            except Exception as e:
-                print(f"Error loading blockchain: {e}")
+        """Load blockchain from file if it exists
+        
+        Raises ValueError rather than starting fresh when the saved chain fails
+        verification, so a bad key or a damaged file is never overwritten.
+        """
+        if not os.path.exists(self.blockchain_file):
+            return
+        
+        started = time.perf_counter()
+        with open(self.blockchain_file, 'r') as f:
+            data = json.load(f)
+        self.startup_timings['read_blockchain'] = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        # The configured sealer decides the consensus mode and difficulty; a saved
+        # chain in any other mode is refused rather than trusted
+        saved_consensus = data.get('consensus', 'proof_of_work')
+        if saved_consensus != self.blockchain.consensus:
+            raise ValueError(
+                f"Saved blockchain in {self.blockchain_file} is sealed with {saved_consensus}, "
+                f"but this registry is configured for {self.blockchain.consensus}; "
+                f"set LAND_REGISTRY_CONSENSUS (and LAND_REGISTRY_AUTHORITY_KEY) to match"
+            )
+        blockchain = Blockchain.from_dict(
+            data,
+            checkpoint_key=self.checkpoint_key,
+            sealer=self.blockchain.sealer
+        )
+        self.startup_timings['rebuild_chain'] = time.perf_counter() - started
+        
+        # Only trust the saved chain from its latest checkpoint onwards
+        started = time.perf_counter()
+        chain_valid = blockchain.is_chain_valid(from_checkpoint=True)
+        self.startup_timings['verify_chain'] = time.perf_counter() - started
+        
+        latest = blockchain.get_latest_block()
+        if latest.index > 0 and not blockchain.sealer.verify(latest):
+            raise ValueError(
+                f"Saved blockchain in {self.blockchain_file} is not sealed with this registry's "
+                f"{blockchain.consensus} settings; check LAND_REGISTRY_AUTHORITY_KEY"
+            )
+        if not chain_valid:
+            raise ValueError(
+                f"Saved blockchain in {self.blockchain_file} failed verification; "
+                f"check the checkpoint and authority keys before starting the registry"
+            )
+        self.blockchain = blockchain
     
     def save_blockchain(self):
         """Save blockchain to file"""
@@ -30,80 +78,124 @@ class LandRegistry:
         except Exception as e:
             print(f"Error saving blockchain: {e}")
     
+    def compact_blockchain(self):
+        """Archive blocks older than the latest checkpoint to cold storage"""
+        with self.lock:
+            chain = self.blockchain.chain
+            archived = self.blockchain.compact()
+            if not archived:
+                return 0
+            
+            try:
+                with open(self.archive_file, 'a') as f:
+                    for block in archived:
+                        f.write(json.dumps(block) + "\n")
+            except Exception as e:
+                print(f"Error archiving blocks: {e}")
+                # Put the full chain back rather than losing the archived blocks
+                self.blockchain.chain = chain
+                return 0
+            
+            self.save_blockchain()
+            return len(archived)
+    
+    def get_sync_height(self):
+        """Height a replica should sync from: -1 while it only has a local genesis block"""
+        chain = self.blockchain.chain
+        if len(chain) == 1 and chain[0].index == 0:
+            return -1
+        return self.blockchain.get_latest_block().index
+    
+    def apply_blocks(self, blocks):
+        """Verify and append blocks pulled from another registry, then save"""
+        with self.lock:
+            applied = 0
+            try:
+                for block_data in blocks:
+                    if self.blockchain.append_block(Block.from_dict(block_data)):
+                        applied += 1
+            finally:
+                # Keep whatever verified before a bad block or a dropped connection
+                if applied:
+                    self.save_blockchain()
+            return applied
+    
     def register_land(self, land_id, owner_name, owner_address, land_details):
         """Register a new land parcel"""
-        # Check if land already exists
-        current_owner = self.blockchain.get_current_owner(land_id)
-        if current_owner:
+        with self.lock:
+            # Check if land already exists
+            current_owner = self.blockchain.get_current_owner(land_id)
+            if current_owner:
+                return {
+                    "success": False,
+                    "message": f"Land {land_id} is already registered to {current_owner}"
+                }
+            
+            # Create registration transaction
+            transaction = Transaction(
+                from_address="SYSTEM",
+                to_address=owner_address,
+                land_id=land_id,
+                transaction_type="register",
+                details={
+                    "owner_name": owner_name,
+                    "land_details": land_details,
+                    "registration_date": datetime.now().isoformat()
+                }
+            )
+            
+            # Add transaction to blockchain
+            self.blockchain.add_transaction(transaction)
+            block = self.blockchain.mine_pending_transactions("SYSTEM")
+            self.save_blockchain()
+            
             return {
-                "success": False,
-                "message": f"Land {land_id} is already registered to {current_owner}"
+                "success": True,
+                "message": f"Land {land_id} successfully registered to {owner_name}",
+                "transaction_hash": block.hash
             }
-        
-        # Create registration transaction
-        transaction = Transaction(
-            from_address="SYSTEM",
-            to_address=owner_address,
-            land_id=land_id,
-            transaction_type="register",
-            details={
-                "owner_name": owner_name,
-                "land_details": land_details,
-                "registration_date": datetime.now().isoformat()
-            }
-        )
-        
-        # Add transaction to blockchain
-        self.blockchain.add_transaction(transaction)
-        self.blockchain.mine_pending_transactions("SYSTEM")
-        self.save_blockchain()
-        
-        return {
-            "success": True,
-            "message": f"Land {land_id} successfully registered to {owner_name}",
-            "transaction_hash": self.blockchain.get_latest_block().hash
-        }
     
     def transfer_land(self, land_id, from_owner, to_owner, to_owner_name, transfer_details):
         """Transfer land ownership"""
-        # Check if land exists
-        current_owner = self.blockchain.get_current_owner(land_id)
-        if not current_owner:
-            return {
-                "success": False,
-                "message": f"Land {land_id} is not registered"
-            }
-        
-        # Check if from_owner is the current owner
-        if current_owner != from_owner:
+        with self.lock:
+            # Check if land exists
+            current_owner = self.blockchain.get_current_owner(land_id)
+            if not current_owner:
+                return {
+                    "success": False,
+                    "message": f"Land {land_id} is not registered"
+                }
+            
+            # Check if from_owner is the current owner
+            if current_owner != from_owner:
+                return {
+                    "success": False,
+                    "message": f"Only the current owner ({current_owner}) can transfer this land"
+                }
+            
+            # Create transfer transaction
+            transaction = Transaction(
+                from_address=from_owner,
+                to_address=to_owner,
+                land_id=land_id,
+                transaction_type="transfer",
+                details={
+                    "new_owner_name": to_owner_name,
+                    "transfer_details": transfer_details,
+                    "transfer_date": datetime.now().isoformat()
+                }
+            )
+            
+            # Add transaction to blockchain
+            self.blockchain.add_transaction(transaction)
+            block = self.blockchain.mine_pending_transactions("SYSTEM")
+            self.save_blockchain()
+            
             return {
-                "success": False,
-                "message": f"Only the current owner ({current_owner}) can transfer this land"
-            }
-        
-        # Create transfer transaction
-        transaction = Transaction(
-            from_address=from_owner,
-            to_address=to_owner,
-            land_id=land_id,
-            transaction_type="transfer",
-            details={
-                "new_owner_name": to_owner_name,
-                "transfer_details": transfer_details,
-                "transfer_date": datetime.now().isoformat()
+                "success": True,
+                "message": f"Land {land_id} successfully transferred to {to_owner_name}",
+                "transaction_hash": block.hash
             }
-        )
-        
-        # Add transaction to blockchain
-        self.blockchain.add_transaction(transaction)
-        self.blockchain.mine_pending_transactions("SYSTEM")
-        self.save_blockchain()
-        
-        return {
-            "success": True,
-            "message": f"Land {land_id} successfully transferred to {to_owner_name}",
-            "transaction_hash": self.blockchain.get_latest_block().hash
-        }
     
     def get_land_info(self, land_id):
         """Get current information about a land parcel"""
@@ -116,49 +208,31 @@ class LandRegistry:
         
         history = self.blockchain.get_land_history(land_id)
         
-        # Get current owner details from the latest transaction
-        current_details = {}
-        for record in reversed(history):
-            transaction = record['transaction']
-            if transaction.get('transaction_type') in ['register', 'transfer']:
-                current_details = transaction.get('details', {})
-                break
+        # Details and counts come from the ownership state, which still covers
+        # history archived before the latest checkpoint
+        ownership = self.blockchain.get_ownership_state().get(land_id, {})
         
         return {
             "success": True,
             "land_id": land_id,
             "current_owner": current_owner,
-            "current_details": current_details,
-            "transaction_count": len(history),
+            "current_details": ownership.get('details', {}),
+            "transaction_count": ownership.get('transaction_count', len(history)),
             "history": history
         }
     
     def get_all_lands(self):
         """Get information about all registered lands"""
-        all_transactions = self.blockchain.get_all_transactions()
-        lands = {}
-        
-        for transaction in all_transactions:
-            land_id = transaction.get('land_id')
-            if land_id and transaction.get('transaction_type') in ['register', 'transfer']:
-                if land_id not in lands:
-                    lands[land_id] = {
-                        "land_id": land_id,
-                        "current_owner": transaction.get('to_address'),
-                        "registration_date": None,
-                        "last_transfer_date": None,
-                        "transaction_count": 0
-                    }
-                
-                lands[land_id]['current_owner'] = transaction.get('to_address')
-                lands[land_id]['transaction_count'] += 1
-                
-                if transaction.get('transaction_type') == 'register':
-                    lands[land_id]['registration_date'] = transaction.get('details', {}).get('registration_date')
-                elif transaction.get('transaction_type') == 'transfer':
-                    lands[land_id]['last_transfer_date'] = transaction.get('details', {}).get('transfer_date')
-        
-        return list(lands.values())
+        return [
+            {
+                "land_id": land_id,
+                "current_owner": record['owner'],
+                "registration_date": record['registration_date'],
+                "last_transfer_date": record['last_transfer_date'],
+                "transaction_count": record['transaction_count']
+            }
+            for land_id, record in self.blockchain.get_ownership_state().items()
+        ]
     
     def verify_blockchain_integrity(self):
         """Verify the integrity of the blockchain"""
@@ -167,19 +241,17 @@ class LandRegistry:
     def get_blockchain_stats(self):
         """Get blockchain statistics"""
         all_transactions = self.blockchain.get_all_transactions()
+        ownership = self.blockchain.get_ownership_state()
+        latest_checkpoint = self.blockchain.get_latest_checkpoint()
         
+        # Counted from the ownership state so archived blocks are still included
         stats = {
             "total_blocks": len(self.blockchain.chain),
             "total_transactions": len(all_transactions),
-            "total_lands_registered": 0,
-            "total_transfers": 0,
-            "blockchain_valid": self.verify_blockchain_integrity()
+            "total_lands_registered": len(ownership),
+            "total_transfers": sum(record['transaction_count'] - 1 for record in ownership.values()),
+            "blockchain_valid": self.verify_blockchain_integrity(),
+            "latest_checkpoint": latest_checkpoint.index if latest_checkpoint else None
         }
         
-        for transaction in all_transactions:
-            if transaction.get('transaction_type') == 'register':
-                stats['total_lands_registered'] += 1
-            elif transaction.get('transaction_type') == 'transfer':
-                stats['total_transfers'] += 1
-        
         return stats
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Load generator for the Land Registry Blockchain System
+
+Drives the Flask app with a concurrent mix of registrations, transfers, lookups
+and listings, reports throughput and p50/p95/p99 latency per route, then checks
+the registry invariants against the chain itself (one registration per land,
+every transfer made by the previous owner, valid chain, no lost writes).
+
+Race operations send several requests for the same land_id at the same moment
+(double registrations and double transfers), so exactly one must win.
+
+By default the app runs in-process on the Flask test client with a throwaway
+blockchain file; pass --url to load a running server instead.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlparse
+
+class TestClientTransport:
+    """Send requests through Flask test clients, one per thread"""
+    
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+    
+    def request(self, method, path, form=None):
+        if not hasattr(self.local, 'client'):
+            self.local.client = self.app.test_client()
+        response = self.local.client.open(path, method=method, data=form)
+        return response.status_code, response.get_data()
+
+class HttpTransport:
+    """Send requests to a running server, one connection per thread"""
+    
+    def __init__(self, url):
+        parsed = urlparse(url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.local = threading.local()
+    
+    def request(self, method, path, form=None):
+        if not hasattr(self.local, 'connection'):
+            self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        
+        body = urlencode(form) if form is not None else None
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'} if form is not None else {}
+        try:
+            self.local.connection.request(method, path, body=body, headers=headers)
+            response = self.local.connection.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError):
+            # Drop the broken connection so the next request reconnects
+            self.local.connection.close()
+            del self.local.connection
+            raise
+
+class LoadGenerator:
+    """Run a weighted mix of registry operations and record what succeeded"""
+    
+    def __init__(self, transport, mix, race_size=4):
+        self.transport = transport
+        self.race_size = race_size
+        self.operations = list(mix.keys())
+        self.weights = list(mix.values())
+        self.run_id = uuid.uuid4().hex[:8]
+        
+        self.lock = threading.Lock()
+        self.latencies = {}  # route -> [seconds]
+        self.errors = {}  # route -> count
+        self.owners = {}  # land_id -> owner address after the last successful write
+        self.land_locks = {}  # land_id -> lock so transfers of one land go out in order
+        self.writes = []  # (transaction_type, land_id, to_address) for each successful write
+        self.registered = 0
+        self.transferred = 0
+        self.counter = 0
+    
+    def timed_request(self, route, method, path, form=None, expected=(200,)):
+        started = time.perf_counter()
+        try:
+            status, body = self.transport.request(method, path, form)
+        except Exception:
+            status, body = None, b''
+        elapsed = time.perf_counter() - started
+        
+        with self.lock:
+            self.latencies.setdefault(route, []).append(elapsed)
+            if status not in expected:
+                self.errors[route] = self.errors.get(route, 0) + 1
+        return status, body
+    
+    def next_id(self):
+        with self.lock:
+            self.counter += 1
+            return self.counter
+    
+    def pick_land(self):
+        with self.lock:
+            if not self.owners:
+                return None
+            return random.choice(list(self.owners))
+    
+    def register(self):
+        number = self.next_id()
+        land_id = f"LOAD-{self.run_id}-{number}"
+        owner = f"Owner {number}"
+        status, _ = self.timed_request('POST /register', 'POST', '/register', {
+            'land_id': land_id,
+            'owner_name': owner,
+            'owner_address': owner,
+            'area': str(random.randint(100, 10000)),
+            'location': 'Load Test',
+            'land_type': random.choice(['residential', 'commercial', 'agricultural']),
+            'survey_number': f"SY-{number}",
+            'description': 'Generated by load_generator.py'
+        }, expected=(302,))
+        
+        # A successful registration redirects to the land's page
+        if status == 302:
+            self.record_registration(land_id, owner)
+    
+    def record_registration(self, land_id, owner):
+        with self.lock:
+            self.owners[land_id] = owner
+            self.land_locks.setdefault(land_id, threading.Lock())
+            self.writes.append(('register', land_id, owner))
+            self.registered += 1
+    
+    def record_transfer(self, land_id, to_owner):
+        with self.lock:
+            self.owners[land_id] = to_owner
+            self.writes.append(('transfer', land_id, to_owner))
+            self.transferred += 1
+    
+    def race(self, send):
+        """Call send(i) from race_size threads released at the same moment"""
+        barrier = threading.Barrier(self.race_size)
+        statuses = [None] * self.race_size
+        
+        def contender(i):
+            barrier.wait()
+            statuses[i] = send(i)
+        
+        threads = [threading.Thread(target=contender, args=(i,)) for i in range(self.race_size)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return statuses
+    
+    def transfer(self):
+        land_id = self.pick_land()
+        if land_id is None:
+            return self.register()
+        
+        with self.land_locks[land_id]:
+            from_owner = self.owners[land_id]
+            to_owner = f"Buyer {self.next_id()}"
+            status, _ = self.timed_request('POST /transfer', 'POST', '/transfer', {
+                'land_id': land_id,
+                'from_owner': from_owner,
+                'to_owner': to_owner,
+                'to_owner_name': to_owner,
+                'transfer_reason': 'sale',
+                'transfer_amount': str(random.randint(1000, 1000000)),
+                'notes': 'Generated by load_generator.py'
+            }, expected=(302,))
+            
+            if status == 302:
+                self.record_transfer(land_id, to_owner)
+    
+    def register_race(self):
+        """Register one new land_id to several owners at once; only one may win"""
+        number = self.next_id()
+        land_id = f"LOAD-{self.run_id}-{number}"
+        owners = [f"Racer {number}-{i}" for i in range(self.race_size)]
+        
+        def send(i):
+            status, _ = self.timed_request('POST /register (race)', 'POST', '/register', {
+                'land_id': land_id,
+                'owner_name': owners[i],
+                'owner_address': owners[i],
+                'area': '100',
+                'location': 'Load Test',
+                'land_type': 'residential',
+                'survey_number': f"SY-{number}",
+                'description': 'Generated by load_generator.py'
+            }, expected=(200, 302))
+            return status
+        
+        for i, status in enumerate(self.race(send)):
+            if status == 302:
+                self.record_registration(land_id, owners[i])
+    
+    def transfer_race(self):
+        """Transfer one land from its owner to several buyers at once; only one may win"""
+        land_id = self.pick_land()
+        if land_id is None:
+            return self.register()
+        
+        with self.land_locks[land_id]:
+            from_owner = self.owners[land_id]
+            number = self.next_id()
+            buyers = [f"Racing Buyer {number}-{i}" for i in range(self.race_size)]
+            
+            def send(i):
+                status, _ = self.timed_request('POST /transfer (race)', 'POST', '/transfer', {
+                    'land_id': land_id,
+                    'from_owner': from_owner,
+                    'to_owner': buyers[i],
+                    'to_owner_name': buyers[i],
+                    'transfer_reason': 'sale',
+                    'transfer_amount': '1000',
+                    'notes': 'Generated by load_generator.py'
+                }, expected=(200, 302))
+                return status
+            
+            for i, status in enumerate(self.race(send)):
+                if status == 302:
+                    self.record_transfer(land_id, buyers[i])
+    
+    def lookup(self):
+        land_id = self.pick_land()
+        if land_id is None:
+            return self.register()
+        self.timed_request('GET /api/land/<land_id>', 'GET', f'/api/land/{land_id}')
+    
+    def listing(self):
+        self.timed_request('GET /api/lands', 'GET', '/api/lands')
+    
+    def run_operation(self, _):
+        operation = random.choices(self.operations, weights=self.weights)[0]
+        getattr(self, operation)()
+    
+    def run(self, requests, concurrency):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(self.run_operation, range(requests)))
+        return time.perf_counter() - started
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))
+    return ordered[rank]
+
+def build_report(generator, elapsed):
+    total_requests = sum(len(samples) for samples in generator.latencies.values())
+    routes = {}
+    for route, samples in sorted(generator.latencies.items()):
+        routes[route] = {
+            "requests": len(samples),
+            "errors": generator.errors.get(route, 0),
+            "throughput": len(samples) / elapsed if elapsed else 0,
+            "p50_ms": percentile(samples, 0.50) * 1000,
+            "p95_ms": percentile(samples, 0.95) * 1000,
+            "p99_ms": percentile(samples, 0.99) * 1000
+        }
+    
+    return {
+        "elapsed_seconds": elapsed,
+        "total_requests": total_requests,
+        "throughput": total_requests / elapsed if elapsed else 0,
+        "routes": routes
+    }
+
+def fetch_chain_transactions(transport):
+    """Get every transaction in the chain, in order, from /api/blocks"""
+    status, body = transport.request('GET', '/api/blocks?from_height=-1')
+    if status != 200:
+        return None
+    
+    transactions = []
+    for line in body.splitlines():
+        if line.strip():
+            transactions.extend(json.loads(line)['transactions'])
+    return transactions
+
+def check_chain(transactions, generator):
+    """Check ownership rules against the chain's transactions"""
+    failures = []
+    owners = {}  # land_id -> owner after replaying the chain so far
+    
+    for transaction in transactions:
+        land_id = transaction.get('land_id')
+        transaction_type = transaction.get('transaction_type')
+        
+        # A compacted chain starts from a checkpoint's ownership snapshot
+        if transaction_type == 'checkpoint':
+            ownership = transaction.get('details', {}).get('ownership', {})
+            owners = {land: record['owner'] for land, record in ownership.items()}
+        elif transaction_type == 'register':
+            if land_id in owners:
+                failures.append(f"{land_id} registered more than once")
+            owners[land_id] = transaction.get('to_address')
+        elif transaction_type == 'transfer':
+            if land_id not in owners:
+                failures.append(f"{land_id} transferred before it was registered")
+            elif transaction.get('from_address') != owners[land_id]:
+                failures.append(f"{land_id} transferred by {transaction.get('from_address')}, "
+                                f"but the owner was {owners[land_id]}")
+            owners[land_id] = transaction.get('to_address')
+    
+    recorded = {
+        (transaction.get('transaction_type'), transaction.get('land_id'), transaction.get('to_address'))
+        for transaction in transactions
+    }
+    for transaction_type, land_id, to_address in generator.writes:
+        if (transaction_type, land_id, to_address) not in recorded:
+            failures.append(f"lost {transaction_type}: {land_id} to {to_address} succeeded but is not in the chain")
+    
+    return failures
+
+def check_invariants(transport, generator, stats_before):
+    """Check the registry state against every write the generator saw succeed"""
+    transactions = fetch_chain_transactions(transport)
+    if transactions is None:
+        failures = ["could not read the chain from /api/blocks"]
+    else:
+        failures = check_chain(transactions, generator)
+    
+    status, body = transport.request('GET', '/api/lands')
+    lands = json.loads(body) if status == 200 else []
+    owners = {land['land_id']: land['current_owner'] for land in lands}
+    for land_id, owner in generator.owners.items():
+        if land_id not in owners:
+            failures.append(f"lost registration: {land_id}")
+        elif owners[land_id] != owner:
+            failures.append(f"lost transfer: {land_id} is owned by {owners[land_id]}, expected {owner}")
+    
+    status, body = transport.request('GET', '/api/verify')
+    if status != 200 or not json.loads(body).get('valid'):
+        failures.append("blockchain failed verification")
+    
+    status, body = transport.request('GET', '/api/stats')
+    stats_after = json.loads(body) if status == 200 else {}
+    registered = stats_after.get('total_lands_registered', 0) - stats_before.get('total_lands_registered', 0)
+    transferred = stats_after.get('total_transfers', 0) - stats_before.get('total_transfers', 0)
+    if registered != generator.registered:
+        failures.append(f"{generator.registered} registrations succeeded but {registered} were recorded")
+    if transferred != generator.transferred:
+        failures.append(f"{generator.transferred} transfers succeeded but {transferred} were recorded")
+    
+    return failures
+
+def create_local_transport(args, data_dir):
+    """Point the app at a fresh registry in data_dir and wrap it in test clients"""
+    from templates import app as app_module
+    from templates.land_registry import LandRegistry
+    
+    app_module.land_registry = LandRegistry(
+        blockchain_file=os.path.join(data_dir, 'blockchain_data.json'),
+        archive_file=os.path.join(data_dir, 'blockchain_archive.jsonl'),
+        consensus=args.consensus,
+        authority_key=args.authority_key
+    )
+    return TestClientTransport(app_module.app)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test the Land Registry Blockchain System")
+    parser.add_argument('--url', help="Load a running server (e.g. http://127.0.0.1:5000) instead of the test client")
+    parser.add_argument('--requests', type=int, default=500, help="Operations to run")
+    parser.add_argument('--concurrency', type=int, default=8, help="Concurrent client threads")
+    parser.add_argument('--seed-lands', type=int, default=20, help="Lands registered before the timed run")
+    parser.add_argument('--register', type=float, default=2, help="Weight of registrations in the mix")
+    parser.add_argument('--transfer', type=float, default=2, help="Weight of transfers in the mix")
+    parser.add_argument('--lookup', type=float, default=5, help="Weight of land lookups in the mix")
+    parser.add_argument('--listing', type=float, default=1, help="Weight of land listings in the mix")
+    parser.add_argument('--register-race', type=float, default=1,
+                        help="Weight of concurrent double registrations of one land_id")
+    parser.add_argument('--transfer-race', type=float, default=1,
+                        help="Weight of concurrent double transfers of one land_id")
+    parser.add_argument('--race-size', type=int, default=4, help="Requests sent at once in each race")
+    parser.add_argument('--consensus', default=None, help="Consensus mode for the in-process registry")
+    parser.add_argument('--authority-key', default=None, help="Authority key for the in-process registry")
+    parser.add_argument('--json', dest='json_file', help="Also write the report to this file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print("🔗 Load testing Land Registry Blockchain System")
+    print("=" * 50)
+    
+    data_dir = None
+    if args.url:
+        transport = HttpTransport(args.url)
+        print(f"🌐 Target: {args.url}")
+    else:
+        data_dir = tempfile.mkdtemp()
+        try:
+            transport = create_local_transport(args, data_dir)
+        except ImportError as e:
+            print(f"❌ Import error: {e}")
+            return False
+        print(f"🧪 Target: Flask test client (data in {data_dir})")
+    
+    mix = {
+        'register': args.register,
+        'transfer': args.transfer,
+        'lookup': args.lookup,
+        'listing': args.listing,
+        'register_race': args.register_race,
+        'transfer_race': args.transfer_race
+    }
+    generator = LoadGenerator(transport, mix, args.race_size)
+    
+    status, body = transport.request('GET', '/api/stats')
+    if status != 200:
+        print(f"❌ Could not read /api/stats (status {status})")
+        return False
+    stats_before = json.loads(body)
+    
+    for _ in range(args.seed_lands):
+        generator.register()
+    generator.latencies.clear()
+    generator.errors.clear()
+    
+    print(f"⚡ {args.requests} operations, {args.concurrency} threads, mix {mix}")
+    elapsed = generator.run(args.requests, args.concurrency)
+    report = build_report(generator, elapsed)
+    
+    print(f"\n📊 {report['total_requests']} requests in {elapsed:.2f}s ({report['throughput']:.1f} req/s)")
+    print(f"   {'route':<26}{'count':>7}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for route, row in report['routes'].items():
+        print(f"   {route:<26}{row['requests']:>7}{row['errors']:>8}{row['throughput']:>9.1f}"
+              f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}")
+    
+    print("\n🔐 Checking invariants...")
+    failures = check_invariants(transport, generator, stats_before)
+    report['invariant_failures'] = failures
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print(f"✅ {len(generator.owners)} lands: one registration each, every transfer by the owner, "
+              f"chain is valid, no lost writes")
+    
+    if args.json_file:
+        with open(args.json_file, 'w') as f:
+            json.dump(report, f, indent=2)
+    
+    return not failures
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
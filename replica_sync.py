@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Replica sync client for the Land Registry Blockchain System
+
+Pulls only the blocks a replica is missing from a primary's /api/blocks
+endpoint. It checks each block's hash, seal and previous_hash link before
+adding it to the replica's chain.
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+import urllib.request
+from templates.land_registry import LandRegistry
+
+def fetch_blocks(primary_url, from_height, compress=True):
+    """Stream blocks above from_height from a primary registry"""
+    url = f"{primary_url.rstrip('/')}/api/blocks?from_height={from_height}"
+    headers = {'Accept-Encoding': 'gzip'} if compress else {}
+    
+    with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=60) as response:
+        stream = response
+        if response.headers.get('Content-Encoding') == 'gzip':
+            stream = gzip.GzipFile(fileobj=response)
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+def sync_once(registry, primary_url, compress=True):
+    """Bring a registry up to date with the primary, returning the number of blocks applied"""
+    return registry.apply_blocks(fetch_blocks(primary_url, registry.get_sync_height(), compress))
+
+def sync_forever(registry, primary_url, interval, compress=True):
+    """Keep a registry in sync with the primary, polling every interval seconds"""
+    while True:
+        try:
+            applied = sync_once(registry, primary_url, compress)
+            if applied:
+                print(f"🔄 Synced {applied} blocks, now at height {registry.blockchain.get_latest_block().index}")
+        except Exception as e:
+            print(f"❌ Sync from {primary_url} failed: {e}")
+        time.sleep(interval)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sync a land registry replica from a primary")
+    parser.add_argument('--primary', required=True, help="Primary registry URL, e.g. http://127.0.0.1:5000")
+    parser.add_argument('--blockchain-file', default='replica_blockchain_data.json')
+    parser.add_argument('--consensus', default=None, help="Consensus mode of the primary's chain")
+    parser.add_argument('--authority-key', default=None, help="Authority key to verify block seals")
+    parser.add_argument('--interval', type=float, default=0, help="Poll every N seconds (0 syncs once)")
+    parser.add_argument('--no-compress', action='store_true', help="Do not ask for gzip-compressed blocks")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    registry = LandRegistry(
+        blockchain_file=args.blockchain_file,
+        consensus=args.consensus,
+        authority_key=args.authority_key
+    )
+    
+    if args.interval:
+        try:
+            sync_forever(registry, args.primary, args.interval, not args.no_compress)
+        except KeyboardInterrupt:
+            print("\n\n👋 Sync stopped by user")
+        return True
+    
+    try:
+        applied = sync_once(registry, args.primary, not args.no_compress)
+    except Exception as e:
+        print(f"❌ Sync from {args.primary} failed: {e}")
+        return False
+    
+    print(f"✅ Applied {applied} blocks, now at height {registry.blockchain.get_latest_block().index}")
+    return True
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
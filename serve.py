@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Production entry point for the Land Registry Blockchain System
+
+Runs the Flask app under a multi-threaded WSGI server (waitress when installed,
+otherwise Werkzeug's threaded server). The land registry is loaded in the
+background, and /api/ready returns 503 until it has loaded.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve the Land Registry Blockchain System")
+    parser.add_argument('--host', default=os.environ.get('LAND_REGISTRY_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('LAND_REGISTRY_PORT', 5000)))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('LAND_REGISTRY_THREADS', 8)),
+                        help="Worker threads handling requests (waitress only)")
+    parser.add_argument('--connection-limit', type=int,
+                        default=int(os.environ.get('LAND_REGISTRY_CONNECTION_LIMIT', 100)),
+                        help="Maximum simultaneous connections (waitress only)")
+    parser.add_argument('--replica-of', default=os.environ.get('LAND_REGISTRY_PRIMARY_URL'),
+                        help="Run as a read replica kept in sync with this primary URL")
+    parser.add_argument('--blockchain-file', default=os.environ.get('LAND_REGISTRY_BLOCKCHAIN_FILE'),
+                        help="Chain data file (default blockchain_data.json, or "
+                             "replica_blockchain_data.json with --replica-of)")
+    parser.add_argument('--sync-interval', type=float,
+                        default=float(os.environ.get('LAND_REGISTRY_SYNC_INTERVAL', 5)),
+                        help="Seconds between replica syncs")
+    return parser.parse_args()
+
+def load_registry(init_land_registry, startup_timings, args):
+    """Load the land registry and report the startup phase timings"""
+    try:
+        registry = init_land_registry()
+    except Exception as e:
+        print(f"❌ Failed to load land registry: {e}")
+        # Stop the whole server rather than serve without the saved chain
+        os._exit(1)
+    
+    print("✅ Land registry ready")
+    for phase, seconds in startup_timings.items():
+        print(f"   • {phase}: {seconds * 1000:.1f} ms")
+    
+    if args.replica_of:
+        from templates.replica_sync import sync_forever
+        print(f"🔄 Replicating from {args.replica_of} every {args.sync_interval}s")
+        sync_forever(registry, args.replica_of, args.sync_interval)
+
+def main():
+    args = parse_args()
+    print("🔗 Starting Land Registry Blockchain System")
+    print("=" * 50)
+    
+    started = time.perf_counter()
+    try:
+        from templates.app import app, init_land_registry, startup_timings
+    except ImportError as e:
+        print(f"❌ Import error: {e}")
+        return False
+    startup_timings['import_app'] = time.perf_counter() - started
+    
+    # Replicas only change through sync, so the app refuses writes. They also
+    # default to their own data file so they never save over the primary's
+    app.config['READ_ONLY'] = bool(args.replica_of)
+    default_file = 'replica_blockchain_data.json' if args.replica_of else 'blockchain_data.json'
+    app.config['BLOCKCHAIN_FILE'] = args.blockchain_file or default_file
+    print(f"📁 Chain data: {app.config['BLOCKCHAIN_FILE']}")
+    
+    # Serve straight away; /api/ready reports when the registry has loaded
+    threading.Thread(target=load_registry, args=(init_land_registry, startup_timings, args), daemon=True).start()
+    
+    print(f"🚀 Serving on http://{args.host}:{args.port}")
+    try:
+        try:
+            from waitress import serve
+        except ImportError:
+            print("⚠️  waitress is not installed, using Werkzeug's threaded server (pip install waitress)")
+            from werkzeug.serving import make_server
+            make_server(args.host, args.port, app, threaded=True).serve_forever()
+        else:
+            print(f"⚡ waitress with {args.threads} threads")
+            serve(app, host=args.host, port=args.port, threads=args.threads,
+                  connection_limit=args.connection_limit)
+    except KeyboardInterrupt:
+        print("\n\n👋 Server stopped by user")
+    except Exception as e:
+        print(f"\n❌ Server error: {e}")
+        return False
+    
+    return True
+
+if __name__ == '__main__':
+    success = main()
+    if not success:
+        print("\n❌ Failed to start the server")
+        sys.exit(1)
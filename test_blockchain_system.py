@@ -3,8 +3,12 @@
 Test script for the Land Registry Blockchain System
 """
 
+import os
 import sys
 import json
+import tempfile
+import time
+from templates.blockchain import Block, Transaction, hash_ownership_state
 from templates.land_registry import LandRegistry
 
 def test_blockchain_system():
@@ -12,8 +16,11 @@ def test_blockchain_system():
     print("🔗 Testing Land Registry Blockchain System")
     print("=" * 50)
     
-    # Initialize the land registry
-    registry = LandRegistry()
+    # Initialize the land registry with its own data files
+    data_dir = tempfile.mkdtemp()
+    blockchain_file = os.path.join(data_dir, 'blockchain_data.json')
+    archive_file = os.path.join(data_dir, 'blockchain_archive.jsonl')
+    registry = LandRegistry(blockchain_file=blockchain_file, archive_file=archive_file)
     
     # Test 1: Register a new land
     print("\n📝 Test 1: Registering new land...")
@@ -150,6 +157,205 @@ def test_blockchain_system():
         print(f"❌ Should have rejected non-existent land transfer")
         return False
     
+    # Test 10: Checkpoint, compact and restart from the checkpoint
+    print("\n📍 Test 10: Checkpointing and compacting the chain...")
+    checkpoint = registry.blockchain.create_checkpoint()
+    registry.save_blockchain()
+    
+    # A failed archive write must leave every block in the chain
+    registry.archive_file = data_dir  # A directory cannot be opened for appending
+    chain_before = [block.hash for block in registry.blockchain.chain]
+    archive_failure_kept_chain = (registry.compact_blockchain() == 0
+                                  and [block.hash for block in registry.blockchain.chain] == chain_before)
+    registry.archive_file = archive_file
+    
+    archived = registry.compact_blockchain()
+    
+    # Blocks mined after compaction carry on from the checkpoint's index
+    registry.register_land("LAND004", "Post Compaction", "4 Archive Lane", {"area": 300})
+    mined_indexes = [block.index for block in registry.blockchain.chain]
+    
+    restarted = LandRegistry(blockchain_file=blockchain_file, archive_file=archive_file)
+    
+    # A checkpoint key set after unsigned checkpoints exist must not wipe the saved chain
+    with open(blockchain_file) as f:
+        saved_chain = f.read()
+    try:
+        LandRegistry(blockchain_file=blockchain_file, archive_file=archive_file, checkpoint_key="new-key")
+        unsigned_rejected = False
+    except ValueError:
+        with open(blockchain_file) as f:
+            unsigned_rejected = f.read() == saved_chain
+    land_info = restarted.get_land_info("LAND001")
+    
+    if (archived == checkpoint.index
+            and mined_indexes == [checkpoint.index, checkpoint.index + 1]
+            and restarted.blockchain.chain[0].hash == checkpoint.hash
+            and land_info['success']
+            and land_info['current_owner'] == "789 Business Blvd, Chicago, IL 60601"
+            and land_info['current_details'].get('new_owner_name') == "ABC Corporation"
+            and land_info['transaction_count'] == 2
+            and len(restarted.get_all_lands()) == 3
+            and restarted.verify_blockchain_integrity()
+            and unsigned_rejected
+            and archive_failure_kept_chain):
+        print(f"✅ Archived {archived} blocks, restarted from checkpoint block {checkpoint.index}")
+    else:
+        print("❌ Registry state changed after compaction")
+        return False
+    
+    # Test 10b: Automatic checkpoints do not change the hash a write reports
+    print("\n📍 Test 10b: Returning the transaction's block when a checkpoint follows it...")
+    interval_registry = LandRegistry(blockchain_file=os.path.join(data_dir, 'interval_blockchain.json'))
+    interval_registry.blockchain.checkpoint_interval = 2
+    interval_registry.register_land("LAND201", "Interval Owner", "201 Checkpoint Road", {"area": 100})
+    result = interval_registry.register_land("LAND202", "Interval Owner", "202 Checkpoint Road", {"area": 100})
+    
+    reported = [block for block in interval_registry.blockchain.chain if block.hash == result['transaction_hash']]
+    latest = interval_registry.blockchain.get_latest_block()
+    if (interval_registry.blockchain.get_checkpoint_details(latest) is not None
+            and len(reported) == 1
+            and [t.get('land_id') for t in reported[0].transactions if t.get('transaction_type') == 'register'] == ["LAND202"]):
+        print(f"✅ Write reported block {reported[0].index}, checkpoint followed at block {latest.index}")
+    else:
+        print("❌ Reported transaction hash is not the block holding the transaction")
+        return False
+    
+    # Test 11: Authority-sealed registry skips proof of work and mining rewards
+    print("\n🔏 Test 11: Sealing blocks with the registry authority...")
+    authority_file = os.path.join(data_dir, 'authority_blockchain.json')
+    authority = LandRegistry(blockchain_file=authority_file, consensus="authority", authority_key="test-key")
+    authority.register_land("LAND100", "Authority Owner", "1 Registry Road", {"area": 500})
+    reloaded = LandRegistry(blockchain_file=authority_file, consensus="authority", authority_key="test-key")
+    
+    # A wrong or missing key is a startup error, never an empty chain that overwrites the file
+    key_errors = 0
+    for authority_key in ["wrong-key", None]:
+        try:
+            LandRegistry(blockchain_file=authority_file, consensus="authority", authority_key=authority_key)
+        except ValueError:
+            key_errors += 1
+    
+    # Rewriting the file as an unmined proof-of-work chain must not bypass the authority seal
+    with open(authority_file) as f:
+        downgraded = json.load(f)
+    downgraded['consensus'] = "proof_of_work"
+    downgraded['difficulty'] = 0
+    downgraded['chain'][-1]['transactions'][0]['to_address'] = "Mallory"
+    downgraded['chain'][-1]['hash'] = Block.from_dict(downgraded['chain'][-1]).calculate_hash()
+    downgraded_file = os.path.join(data_dir, 'downgraded_blockchain.json')
+    with open(downgraded_file, 'w') as f:
+        json.dump(downgraded, f)
+    
+    downgrades_rejected = 0
+    for consensus, authority_key in [("authority", "test-key"), (None, None)]:
+        try:
+            LandRegistry(blockchain_file=downgraded_file, consensus=consensus, authority_key=authority_key)
+        except ValueError:
+            downgrades_rejected += 1
+    with open(authority_file) as f:
+        authority_chain_kept = len(json.load(f)['chain']) == len(reloaded.blockchain.chain)
+    
+    latest = reloaded.blockchain.get_latest_block()
+    if (reloaded.blockchain.consensus == "authority"
+            and [t['transaction_type'] for t in latest.transactions] == ["register"]
+            and reloaded.get_land_info("LAND100")['success']
+            and reloaded.verify_blockchain_integrity()
+            and key_errors == 2
+            and authority_chain_kept
+            and downgrades_rejected == 2):
+        print("✅ Authority-sealed chain verified, wrong keys, missing keys and downgrades rejected")
+    else:
+        print("❌ Authority sealing failed")
+        return False
+    
+    # Test 12: Replica catches up from a compacted primary's signed checkpoint, then incrementally
+    print("\n🔄 Test 12: Syncing a replica from the primary...")
+    primary = LandRegistry(
+        blockchain_file=os.path.join(data_dir, 'primary_blockchain.json'),
+        archive_file=os.path.join(data_dir, 'primary_archive.jsonl'),
+        checkpoint_key="checkpoint-key"
+    )
+    primary.register_land("LAND005", "Replica Test", "5 Sync Street", {"area": 750})
+    
+    # A replica that synced before the primary compacted past its height
+    lagging = LandRegistry(
+        blockchain_file=os.path.join(data_dir, 'lagging_blockchain.json'),
+        checkpoint_key="checkpoint-key"
+    )
+    lagging.apply_blocks([block.to_dict() for block in primary.blockchain.get_blocks_after(lagging.get_sync_height())])
+    lagging_height = lagging.get_sync_height()
+    
+    primary.register_land("LAND008", "Replica Test", "8 Sync Street", {"area": 610})
+    primary.blockchain.create_checkpoint()
+    primary.save_blockchain()
+    primary.compact_blockchain()
+    primary.register_land("LAND006", "Replica Test", "6 Sync Street", {"area": 820})
+    
+    def blocks_after(registry):
+        return [block.to_dict() for block in primary.blockchain.get_blocks_after(registry.get_sync_height())]
+    
+    def rejected(registry, blocks):
+        try:
+            registry.apply_blocks(blocks)
+            return False
+        except ValueError:
+            return True
+    
+    # Without the checkpoint key a replica cannot jump to the primary's checkpoint
+    unkeyed = LandRegistry(blockchain_file=os.path.join(data_dir, 'unkeyed_blockchain.json'))
+    unsigned_jump_rejected = rejected(unkeyed, blocks_after(unkeyed))
+    
+    # A fresh replica rejects a genesis block that carries transactions
+    forged_genesis = Block(0, [Transaction("SYSTEM", "Mallory", "LAND005", "register").to_dict()], time.time(), "0")
+    forged_genesis_rejected = rejected(unkeyed, [forged_genesis.to_dict()])
+    
+    replica = LandRegistry(
+        blockchain_file=os.path.join(data_dir, 'replica_blockchain.json'),
+        checkpoint_key="checkpoint-key"
+    )
+    first_sync = replica.apply_blocks(blocks_after(replica))
+    primary.register_land("LAND007", "Replica Test", "7 Sync Street", {"area": 900})
+    new_blocks = blocks_after(replica)
+    
+    tampered = json.loads(json.dumps(new_blocks))
+    tampered[0]['transactions'][0]['to_address'] = "Forged Owner"
+    tampered_rejected = rejected(replica, tampered)
+    
+    # A synced replica never jumps to an unsigned checkpoint
+    ownership = {"LAND005": {"owner": "Mallory", "details": {}, "registration_date": None,
+                             "last_transfer_date": None, "transaction_count": 1}}
+    forged_checkpoint = Block(999, [{
+        "from_address": "SYSTEM",
+        "to_address": None,
+        "land_id": None,
+        "transaction_type": "checkpoint",
+        "details": {"ownership": ownership, "state_hash": hash_ownership_state(ownership), "signature": None},
+        "timestamp": None
+    }], time.time(), "deadbeef")
+    forged_checkpoint.mine_block(replica.blockchain.difficulty)
+    forged_checkpoint_rejected = rejected(replica, [forged_checkpoint.to_dict()])
+    
+    second_sync = replica.apply_blocks(new_blocks)
+    
+    # The lagging replica jumps over the archived blocks to the signed checkpoint
+    lagging_sync = lagging.apply_blocks(blocks_after(lagging))
+    
+    if (first_sync == 2 and second_sync == 1
+            and unsigned_jump_rejected and forged_genesis_rejected
+            and tampered_rejected and forged_checkpoint_rejected
+            and lagging_height == 1 and lagging_sync == 3
+            and lagging.blockchain.get_latest_block().hash == primary.blockchain.get_latest_block().hash
+            and lagging.get_land_info("LAND008")['current_owner'] == "8 Sync Street"
+            and replica.blockchain.get_latest_block().hash == primary.blockchain.get_latest_block().hash
+            and replica.get_land_info("LAND005")['current_owner'] == "5 Sync Street"
+            and replica.get_land_info("LAND007")['current_owner'] == "7 Sync Street"
+            and replica.verify_blockchain_integrity()):
+        print(f"✅ Replica at height {replica.get_sync_height()}, forged and tampered blocks rejected")
+    else:
+        print("❌ Replica sync failed")
+        return False
+    
     print("\n" + "=" * 50)
     print("🎉 All tests passed! Land Registry Blockchain System is working correctly!")
     print("\n🌐 You can now access the web interface at: http://127.0.0.1:5000")